@@ -1,56 +1,112 @@
 """FastAPI app for stock gainers dashboard."""
+import os
+
 import uvicorn
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from datetime import datetime
 from pathlib import Path
 
-from fastapi import FastAPI, Query, HTTPException
+from fastapi import FastAPI, Query, HTTPException, Request
 from fastapi.responses import HTMLResponse
+from pydantic import BaseModel
 
-from src.polygon_client import PolygonClient
+from src.polygon_client import MAX_POLYGON_CLIENTS, PolygonClient, create_http_client
 from src.gainers_engine import GainersEngine
 
-app = FastAPI(title="Stock Gainers")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Share one HTTP connection pool across all requests in this process."""
+    app.state.http = create_http_client()
+    app.state.polygon = OrderedDict()
+    try:
+        yield
+    finally:
+        await app.state.http.aclose()
+
+
+app = FastAPI(title="Stock Gainers", lifespan=lifespan)
 TEMPLATE_PATH = Path(__file__).parent / "src" / "templates" / "dashboard.html"
+DASHBOARD_HTML = TEMPLATE_PATH.read_text()
 
 
 @app.get("/", response_class=HTMLResponse)
 async def dashboard():
-    return TEMPLATE_PATH.read_text()
+    return HTMLResponse(DASHBOARD_HTML)
+
+
+def get_polygon_client(request: Request, api_key: str) -> PolygonClient:
+    """Get the Polygon client for an API key, backed by the shared HTTP client."""
+    clients: OrderedDict[str, PolygonClient] = request.app.state.polygon
+    client = clients.get(api_key)
+    if client is None:
+        client = PolygonClient(api_key, client=request.app.state.http)
+        clients[api_key] = client
+        if len(clients) > MAX_POLYGON_CLIENTS:
+            clients.popitem(last=False)
+    else:
+        clients.move_to_end(api_key)
+    return client
+
+
+class Gainer(BaseModel):
+    """A single row of the /gainers response."""
+
+    ticker: str
+    name: str
+    current_price: float
+    avg_price: float
+    low_price: float
+    volume: int | float
+    gain_window: float
+    gain_from_low: float
+    gain_day: float
+
+
+class GainersResponse(BaseModel):
+    """Response body for /gainers."""
+
+    time: str
+    minutes: int
+    gainers: list[Gainer]
 
 
 @app.get("/gainers")
 async def get_gainers(
+    request: Request,
     api_key: str = Query(..., alias="apiKey", description="Polygon API key"),
     minutes: int = Query(10, ge=1, le=30),
-):
-    client = PolygonClient(api_key)
+) -> GainersResponse:
+    client = get_polygon_client(request, api_key)
     try:
         engine = GainersEngine(client, top_n=20, lookback_minutes=minutes)
         reports = await engine.get_top_gainers()
 
-        return {
-            "time": datetime.now().isoformat(),
-            "minutes": minutes,
-            "gainers": [
-                {
-                    "ticker": r.ticker,
-                    "name": r.name,
-                    "current_price": r.market_price,
-                    "avg_price": r.avg_price,
-                    "low_price": r.low_price,
-                    "volume": r.volume,
-                    "gain_window": r.gain_10min_percent,
-                    "gain_from_low": r.gain_from_low_price,
-                    "gain_day": r.gain_day_percent,
-                }
+        return GainersResponse(
+            time=datetime.now().isoformat(),
+            minutes=minutes,
+            gainers=[
+                Gainer(
+                    ticker=r.ticker,
+                    name=r.name,
+                    current_price=r.market_price,
+                    avg_price=r.avg_price,
+                    low_price=r.low_price,
+                    volume=r.volume,
+                    gain_window=r.gain_10min_percent,
+                    gain_from_low=r.gain_from_low_price,
+                    gain_day=r.gain_day_percent,
+                )
                 for r in reports
             ],
-        }
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        await client.close()
 
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # Each worker process runs its own lifespan, so HTTP clients and caches
+    # are per-process. uvicorn[standard] lets the default "auto" loop and
+    # http settings pick uvloop and httptools wherever they are installed.
+    uvicorn.run("app:app", host="0.0.0.0", port=8000, workers=os.cpu_count())
\ No newline at end of file
@@ -1,11 +1,20 @@
 """Engine for calculating top percentage gainers."""
 import asyncio
 from dataclasses import dataclass
-from datetime import datetime
-from .polygon_client import PolygonClient
+from datetime import datetime, timedelta
 
+import numpy as np
 
-@dataclass
+from .polygon_client import (
+    PolygonClient,
+    bars_between,
+    last_bucket,
+    last_completed_minute,
+    to_epoch_ms,
+)
+
+
+@dataclass(slots=True, frozen=True)
 class GainerReport:
     """Report data for a single gainer stock."""
 
@@ -21,6 +30,28 @@ class GainerReport:
     timestamp: datetime
 
 
+_EMPTY: dict = {}
+
+
+def _percent_change(current: np.ndarray, base: np.ndarray) -> np.ndarray:
+    """Percent change from base to current, or 0 where base is not positive."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(base > 0, (current - base) / base * 100.0, 0.0)
+
+
+def _top_indices(values: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k largest values, largest first, ties in original order."""
+    n = len(values)
+    if 0 < k < n:
+        # Select in O(N), keeping every row tied with the k-th value so the
+        # stable sort below can prefer the earliest of them.
+        kth = np.partition(values, n - k)[n - k]
+        idx = np.flatnonzero(values >= kth)
+    else:
+        idx = np.arange(n)
+    return idx[np.argsort(-values[idx], kind="stable")][:k]
+
+
 class GainersEngine:
     """Engine for computing top percentage gainers from market data."""
 
@@ -37,7 +68,8 @@ class GainersEngine:
         This method:
         1. Fetches current market snapshot for all stocks
         2. Gets the top gainers by daily performance
-        3. Fetches 10-minute bars to calculate short-term gain
+        3. Fetches recent 1-minute bars and rolls them up into 10-minute bars
+           to calculate short-term gain
         4. Ranks and returns top N by 10-minute gain
         """
         snapshots = await self.client.get_gainers()
@@ -45,97 +77,85 @@ class GainersEngine:
         if not snapshots:
             snapshots = await self.client.get_all_tickers_snapshot()
 
-        candidates = []
-        for snap in snapshots[:100]:
-            ticker = snap.get("ticker", "")
-            if not ticker:
-                continue
-
-            last_trade = snap.get("lastTrade", {})
-            day_data = snap.get("day", {})
-            prev_day = snap.get("prevDay", {})
-
-            market_price = last_trade.get("p", 0)
-            if market_price <= 0:
-                continue
-
-            prev_close = prev_day.get("c", 0)
-
-            if prev_close > 0:
-                day_gain = ((market_price - prev_close) / prev_close) * 100
-            else:
-                day_gain = 0
-
-            volume = day_data.get("v", 0)
-
-            candidates.append(
-                {
-                    "ticker": ticker,
-                    "market_price": market_price,
-                    "volume": volume,
-                    "day_gain": day_gain,
-                }
-            )
-
-        candidates.sort(key=lambda c: c["day_gain"], reverse=True)
-        candidates = candidates[: self.top_n + 10]
-
-        tickers = [c["ticker"] for c in candidates]
-
-        bars_1min_future = self.client.fetch_recent_bars_batch(
-            tickers, minutes=self.lookback_minutes
-        )
-        bars_10min_future = self.client.fetch_recent_bars_batch(
-            tickers, minutes=30, multiplier=10
+        # Read every snapshot's fields in one pass, then drop rows without a
+        # ticker or a positive last trade price with a single mask.
+        get = dict.get
+        tickers, prices, prev_closes, volumes = [], [], [], []
+        for snap in snapshots:
+            tickers.append(get(snap, "ticker"))
+            prices.append(get(get(snap, "lastTrade") or _EMPTY, "p", 0))
+            prev_closes.append(get(get(snap, "prevDay") or _EMPTY, "c", 0))
+            volumes.append(get(get(snap, "day") or _EMPTY, "v", 0))
+
+        has_ticker = np.fromiter(map(bool, tickers), dtype=bool, count=len(tickers))
+        prices = np.asarray(prices, dtype=np.float64)
+        prev_closes = np.asarray(prev_closes, dtype=np.float64)
+
+        valid = np.flatnonzero(has_ticker & (prices > 0))
+        prices = prices[valid]
+        day_gains = _percent_change(prices, prev_closes[valid])
+
+        order = _top_indices(day_gains, self.top_n + 10)
+        selected = valid[order]
+        tickers = [tickers[i] for i in selected]
+        volumes = [volumes[i] for i in selected]
+        prices = prices[order]
+        day_gains = day_gains[order]
+
+        # One 1-minute fetch per ticker serves both the lookback average and
+        # the 10-minute bar, which is rolled up locally instead of re-fetched.
+        end_time = last_completed_minute()
+        window_start_ms = to_epoch_ms(end_time - timedelta(minutes=self.lookback_minutes - 1))
+        end_ms = to_epoch_ms(end_time)
+        bars_future = self.client.fetch_recent_bars_batch(
+            tickers, minutes=max(self.lookback_minutes, 30), end_time=end_time
         )
         names_future = self.client.get_ticker_details_batch(tickers)
-        bars_1min_map, bars_10min_map, name_map = await asyncio.gather(
-            bars_1min_future, bars_10min_future, names_future
+        bars_map, name_map = await asyncio.gather(bars_future, names_future)
+
+        # Flatten each ticker's lookback closes so the averages reduce in one pass.
+        closes = []
+        counts = np.zeros(len(tickers), dtype=np.intp)
+        low_prices = prices.copy()
+        base_prices = np.zeros(len(tickers))
+        for i, ticker in enumerate(tickers):
+            bars = bars_map.get(ticker, [])
+            window = [b.close for b in bars_between(bars, window_start_ms, end_ms)]
+            closes.extend(window)
+            counts[i] = len(window)
+
+            bar_10min = last_bucket(bars, 10)
+            if bar_10min:
+                low_prices[i] = bar_10min.low
+                base_prices[i] = bar_10min.close
+
+        sums = np.bincount(
+            np.repeat(np.arange(len(tickers)), counts),
+            weights=np.asarray(closes, dtype=np.float64),
+            minlength=len(tickers),
         )
-
-        reports = []
-        for candidate in candidates:
-            ticker = candidate["ticker"]
-            current_price = candidate["market_price"]
-
-            bars_1min = bars_1min_map.get(ticker, [])
-            avg_price = current_price
-            if len(bars_1min) >= 2:
-                avg_price = sum(b.close for b in bars_1min) / len(bars_1min)
-
-            bars_10min = bars_10min_map.get(ticker, [])
-            gain_10min = 0.0
-            low_price = current_price
-            gain_from_low = 0.0
-
-            if len(bars_10min) >= 1:
-                last_10min_bar = bars_10min[-1]
-                low_price = last_10min_bar.low
-                base_price = last_10min_bar.close
-
-                if base_price > 0:
-                    gain_10min = ((current_price - base_price) / base_price) * 100
-                if low_price > 0:
-                    gain_from_low = ((current_price - low_price) / low_price) * 100
-
-            reports.append(
-                GainerReport(
-                    ticker=ticker,
-                    name=str(name_map.get(ticker, ticker)),
-                    market_price=current_price,
-                    avg_price=round(avg_price, 4),
-                    low_price=round(low_price, 4),
-                    volume=candidate["volume"],
-                    gain_10min_percent=round(gain_10min, 2),
-                    gain_from_low_price=round(gain_from_low, 2),
-                    gain_day_percent=round(candidate["day_gain"], 2),
-                    timestamp=datetime.now(),
-                )
+        avg_prices = np.where(counts >= 2, sums / np.maximum(counts, 1), prices)
+        gains_10min = np.round(_percent_change(prices, base_prices), 2)
+        gains_from_low = np.round(_percent_change(prices, low_prices), 2)
+
+        # Rank by 10-minute gain and only build reports for the top N
+        top = _top_indices(gains_10min, self.top_n)
+        now = datetime.now()
+        return [
+            GainerReport(
+                ticker=tickers[i],
+                name=str(name_map.get(tickers[i], tickers[i])),
+                market_price=float(prices[i]),
+                avg_price=round(float(avg_prices[i]), 4),
+                low_price=round(float(low_prices[i]), 4),
+                volume=volumes[i],
+                gain_10min_percent=float(gains_10min[i]),
+                gain_from_low_price=float(gains_from_low[i]),
+                gain_day_percent=round(float(day_gains[i]), 2),
+                timestamp=now,
             )
-
-        # Sort by 10-minute gain and return top N
-        reports.sort(key=lambda r: r.gain_10min_percent, reverse=True)
-        return reports[: self.top_n]
+            for i in top
+        ]
 
     async def get_top_gainers_simple(self) -> list[GainerReport]:
         """
@@ -151,9 +171,9 @@ class GainersEngine:
             if not ticker:
                 continue
 
-            last_trade = snap.get("lastTrade", {})
-            day_data = snap.get("day", {})
-            prev_day = snap.get("prevDay", {})
+            last_trade = snap.get("lastTrade") or _EMPTY
+            day_data = snap.get("day") or _EMPTY
+            prev_day = snap.get("prevDay") or _EMPTY
 
             market_price = last_trade.get("p", 0)
             prev_close = prev_day.get("c", 0)
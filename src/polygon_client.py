@@ -1,12 +1,42 @@
 """Polygon.io API client for fetching stock market data."""
 import asyncio
+import time
+from bisect import bisect_left, bisect_right
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 import httpx
+import orjson
 from dataclasses import dataclass
+from operator import attrgetter
 
 
-@dataclass
+BASE_URL = "https://api.polygon.io"
+MAX_CONNECTIONS = 200
+# API keys come from the query string, so the app keeps at most this many
+# clients (and their caches) alive at once.
+MAX_POLYGON_CLIENTS = 16
+# Per-client cap on concurrent bar and name fetches, sized so that every
+# live client fetching at once still fits within the shared pool.
+MAX_CONCURRENCY = MAX_CONNECTIONS // MAX_POLYGON_CLIENTS
+SNAPSHOT_TTL_SECONDS = 2.0
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Create an HTTP/2 client configured for Polygon API traffic."""
+    return httpx.AsyncClient(
+        base_url=BASE_URL,
+        http2=True,
+        timeout=httpx.Timeout(30.0, connect=5.0),
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_CONNECTIONS,
+            keepalive_expiry=60.0,
+        ),
+        headers={"Accept-Encoding": "gzip"},
+    )
+
+
+@dataclass(slots=True, frozen=True)
 class StockBar:
     """Represents a single 1-minute OHLCV bar."""
 
@@ -16,32 +46,110 @@ class StockBar:
     low: float
     close: float
     volume: int
-    timestamp: datetime
+    timestamp: int  # bar start, epoch milliseconds (UTC)
     vwap: Optional[float] = None
 
 
+def to_epoch_ms(dt: datetime) -> int:
+    """Convert a datetime to epoch milliseconds, as used in bar timestamps."""
+    return int(dt.timestamp() * 1000)
+
+
+def bars_between(bars: list[StockBar], start_ms: int, end_ms: int) -> list[StockBar]:
+    """Slice ascending bars to those timestamped within [start_ms, end_ms]."""
+    key = attrgetter("timestamp")
+    return bars[bisect_left(bars, start_ms, key=key) : bisect_right(bars, end_ms, key=key)]
+
+
+def last_completed_minute() -> datetime:
+    """Return the start of the most recently completed UTC minute."""
+    return datetime.now(tz=timezone.utc).replace(second=0, microsecond=0) - timedelta(minutes=1)
+
+
+def resample_bars(bars: list[StockBar], multiplier: int) -> list[StockBar]:
+    """
+    Roll ascending 1-minute bars up into clock-aligned multi-minute bars.
+
+    Each bucket's vwap is the volume-weighted mean of its minute vwaps, or
+    None if any minute lacks one or the bucket traded no volume.
+    """
+    bucket_ms = multiplier * 60_000
+    key = attrgetter("timestamp")
+    resampled: list[StockBar] = []
+    i = 0
+    while i < len(bars):
+        start = bars[i].timestamp - bars[i].timestamp % bucket_ms
+        j = bisect_left(bars, start + bucket_ms, lo=i, key=key)
+        bucket = bars[i:j]
+
+        volume = sum(b.volume for b in bucket)
+        vwap = None
+        if volume and all(b.vwap is not None for b in bucket):
+            vwap = sum(b.vwap * b.volume for b in bucket) / volume
+
+        resampled.append(
+            StockBar(
+                ticker=bucket[0].ticker,
+                open=bucket[0].open,
+                high=max(b.high for b in bucket),
+                low=min(b.low for b in bucket),
+                close=bucket[-1].close,
+                volume=volume,
+                timestamp=start,
+                vwap=vwap,
+            )
+        )
+        i = j
+    return resampled
+
+
+def last_bucket(bars: list[StockBar], multiplier: int) -> Optional[StockBar]:
+    """Roll up only the final clock-aligned bucket of ascending 1-minute bars."""
+    if not bars:
+        return None
+    last = bars[-1].timestamp
+    start = last - last % (multiplier * 60_000)
+    tail = bars[bisect_left(bars, start, key=attrgetter("timestamp")) :]
+    return resample_bars(tail, multiplier)[0]
+
+
 class PolygonClient:
     """Client for interacting with Polygon.io REST API."""
 
-    BASE_URL = "https://api.polygon.io"
+    BASE_URL = BASE_URL
+
+    def __init__(
+        self,
+        api_key: str,
+        client: Optional[httpx.AsyncClient] = None,
+        max_concurrency: int = MAX_CONCURRENCY,
+        cache_ttl: float = SNAPSHOT_TTL_SECONDS,
+    ):
+        """
+        Create a client for one API key.
 
-    def __init__(self, api_key: str):
+        An injected ``client`` is shared and never closed by this instance.
+        Requests go to its ``base_url`` when it has one, otherwise to BASE_URL.
+        """
         self.api_key = api_key
         self._ticker_names: dict[str, str] = {}
-        self._client: Optional[httpx.AsyncClient] = None
+        self._inflight: dict[str, asyncio.Future[str]] = {}
+        self._cache_ttl = cache_ttl
+        self._responses: dict[tuple, tuple[float, dict]] = {}
+        self._response_locks: dict[tuple, asyncio.Lock] = {}
+        self._client = client
+        self._owns_client = client is None
+        self._sem = asyncio.Semaphore(max_concurrency)
 
     async def _get_client(self) -> httpx.AsyncClient:
         """Get or create a reusable HTTP client."""
-        if self._client is None or self._client.is_closed:
-            self._client = httpx.AsyncClient(
-                timeout=30.0,
-                limits=httpx.Limits(max_connections=50, max_keepalive_connections=50),
-            )
+        if self._client is None or (self._owns_client and self._client.is_closed):
+            self._client = create_http_client()
         return self._client
 
     async def close(self):
-        """Close the HTTP client."""
-        if self._client and not self._client.is_closed:
+        """Close the HTTP client if this instance created it."""
+        if self._owns_client and self._client and not self._client.is_closed:
             await self._client.aclose()
 
     async def _request(self, endpoint: str, params: dict = None) -> dict:
@@ -50,18 +158,51 @@ class PolygonClient:
         params["apiKey"] = self.api_key
 
         client = await self._get_client()
-        response = await client.get(f"{self.BASE_URL}{endpoint}", params=params)
+        url = endpoint if client.base_url.host else f"{self.BASE_URL}{endpoint}"
+        response = await client.get(url, params=params)
         response.raise_for_status()
-        return response.json()
+        return orjson.loads(response.content)
+
+    async def _cached_request(self, endpoint: str, params: dict = None) -> dict:
+        """
+        Make a request whose parsed response is reused for a short TTL.
+
+        Concurrent callers for the same endpoint and params share a single
+        upstream fetch instead of each issuing their own.
+        """
+        key = (endpoint, tuple(sorted((params or {}).items())))
+        cached = self._responses.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        lock = self._response_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            cached = self._responses.get(key)
+            if cached and cached[0] > time.monotonic():
+                return cached[1]
+
+            self._evict_expired_responses()
+            data = await self._request(endpoint, params=dict(params or {}))
+            self._responses[key] = (time.monotonic() + self._cache_ttl, data)
+            return data
+
+    def _evict_expired_responses(self):
+        """Drop expired cached responses and locks no caller is holding."""
+        now = time.monotonic()
+        for key in [k for k, (expires, _) in self._responses.items() if expires <= now]:
+            del self._responses[key]
+        for key in [k for k, lock in self._response_locks.items() if not lock.locked()]:
+            if key not in self._responses:
+                del self._response_locks[key]
 
     async def get_gainers(self) -> list[dict]:
         """Get current top gainers from the market snapshot."""
-        data = await self._request("/v2/snapshot/locale/us/markets/stocks/gainers")
+        data = await self._cached_request("/v2/snapshot/locale/us/markets/stocks/gainers")
         return data.get("tickers", [])
 
     async def get_all_tickers_snapshot(self) -> list[dict]:
         """Get snapshot of all US stock tickers."""
-        data = await self._request(
+        data = await self._cached_request(
             "/v2/snapshot/locale/us/markets/stocks/tickers",
             params={"include_otc": "true"},
         )
@@ -82,26 +223,49 @@ class PolygonClient:
             return {"name": ticker}
 
     async def get_ticker_details_batch(self, tickers: list[str]) -> dict[str, str]:
-        """Get company names for multiple tickers concurrently."""
+        """
+        Get company names for multiple tickers concurrently.
+
+        Tickers already being looked up by another caller are awaited rather
+        than requested a second time.
+        """
         result = {}
+        pending: dict[str, asyncio.Future[str]] = {}
         uncached = []
+        loop = asyncio.get_running_loop()
         for t in tickers:
             if t in self._ticker_names:
                 result[t] = self._ticker_names[t]
+            elif t in self._inflight:
+                pending[t] = self._inflight[t]
             else:
+                pending[t] = self._inflight[t] = loop.create_future()
                 uncached.append(t)
 
-        if not uncached:
+        if not pending:
             return result
 
-        async def fetch_name(t: str) -> tuple[str, str]:
-            details = await self.get_ticker_details(t)
-            return t, details.get("name", t)
+        async def fetch_name(t: str) -> None:
+            async with self._sem:
+                details = await self.get_ticker_details(t)
+            future = pending[t]
+            if not future.done():
+                future.set_result(details.get("name", t))
 
-        tasks = [fetch_name(t) for t in uncached]
-        results = await asyncio.gather(*tasks)
-        for t, name in results:
-            result[t] = name
+        try:
+            await asyncio.gather(*(fetch_name(t) for t in uncached))
+        finally:
+            # Release waiters even if this call is cancelled before its
+            # lookups run, falling back to the ticker symbol.
+            for t in uncached:
+                future = pending[t]
+                if self._inflight.get(t) is future:
+                    del self._inflight[t]
+                if not future.done():
+                    future.set_result(t)
+
+        for t, future in pending.items():
+            result[t] = await asyncio.shield(future)
 
         return result
 
@@ -112,12 +276,13 @@ class PolygonClient:
         to_date: datetime,
         timespan: str = "minute",
         multiplier: int = 1,
+        limit: int = 50000,
     ) -> list[StockBar]:
         """Get aggregate bars for a ticker."""
-        from_ts = int(from_date.timestamp() * 1000)
-        to_ts = int(to_date.timestamp() * 1000)
+        from_ts = to_epoch_ms(from_date)
+        to_ts = to_epoch_ms(to_date)
 
-        params = {"adjusted": "true", "sort": "asc", "limit": 50000}
+        params = {"adjusted": "true", "sort": "asc", "limit": limit}
 
         data = await self._request(
             f"/v2/aggs/ticker/{ticker}/range/{multiplier}/{timespan}/{from_ts}/{to_ts}",
@@ -134,7 +299,7 @@ class PolygonClient:
                     low=result["l"],
                     close=result["c"],
                     volume=result["v"],
-                    timestamp=datetime.fromtimestamp(result["t"] / 1000, tz=timezone.utc),
+                    timestamp=result["t"],
                     vwap=result.get("vw"),
                 )
             )
@@ -153,29 +318,36 @@ class PolygonClient:
 
     async def get_grouped_daily_bars(self, date: str) -> list[dict]:
         """Get all stocks' daily bars for a specific date."""
-        data = await self._request(
+        data = await self._cached_request(
             f"/v2/aggs/grouped/locale/us/market/stocks/{date}",
             params={"adjusted": "true", "include_otc": "true"},
         )
         return data.get("results", [])
 
     async def fetch_recent_bars_batch(
-        self, tickers: list[str], minutes: int = 10, multiplier: int = 1
+        self,
+        tickers: list[str],
+        minutes: int = 10,
+        multiplier: int = 1,
+        end_time: Optional[datetime] = None,
     ) -> dict[str, list[StockBar]]:
         """Fetch recent completed bars for multiple tickers."""
-        end_time = datetime.now(tz=timezone.utc).replace(second=0, microsecond=0) - timedelta(minutes=1)
+        end_time = end_time or last_completed_minute()
         start_time = end_time - timedelta(minutes=minutes - 1)
-        from_date = start_time - timedelta(minutes=5)
 
         async def fetch_single(ticker: str) -> tuple[str, list[StockBar]]:
-            try:
-                bars = await self.get_aggregate_bars(
-                    ticker, from_date, end_time, multiplier=multiplier
-                )
-                window = [b for b in bars if start_time <= b.timestamp <= end_time]
-                return ticker, window
-            except Exception:
-                return ticker, []
+            async with self._sem:
+                try:
+                    bars = await self.get_aggregate_bars(
+                        ticker,
+                        start_time,
+                        end_time,
+                        multiplier=multiplier,
+                        limit=minutes + 2,
+                    )
+                    return ticker, bars
+                except Exception:
+                    return ticker, []
 
         tasks = [fetch_single(t) for t in tickers]
         results = await asyncio.gather(*tasks)
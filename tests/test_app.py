@@ -0,0 +1,72 @@
+"""Tests for the FastAPI app wiring."""
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import app
+
+
+def make_request() -> SimpleNamespace:
+    state = SimpleNamespace(http=None, polygon=OrderedDict())
+    return SimpleNamespace(app=SimpleNamespace(state=state))
+
+
+def test_polygon_client_is_reused_per_api_key():
+    request = make_request()
+    assert app.get_polygon_client(request, "a") is app.get_polygon_client(request, "a")
+
+
+def test_polygon_clients_are_bounded_to_recent_keys():
+    request = make_request()
+    first = app.get_polygon_client(request, "key-0")
+    for i in range(1, app.MAX_POLYGON_CLIENTS + 5):
+        app.get_polygon_client(request, f"key-{i}")
+        # Keep the first key hot so it survives eviction.
+        app.get_polygon_client(request, "key-0")
+
+    clients = request.app.state.polygon
+    assert len(clients) == app.MAX_POLYGON_CLIENTS
+    assert clients["key-0"] is first
+    assert "key-1" not in clients
+
+
+def test_gainers_endpoint_serializes_reports(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from src.gainers_engine import GainerReport
+
+    async def fake_top_gainers(self):
+        return [
+            GainerReport(
+                ticker="AAA",
+                name="AAA Inc",
+                market_price=10.5,
+                avg_price=10.25,
+                low_price=10.0,
+                volume=1200,
+                gain_10min_percent=5.0,
+                gain_from_low_price=5.0,
+                gain_day_percent=12.5,
+                timestamp=None,
+            )
+        ]
+
+    monkeypatch.setattr(app.GainersEngine, "get_top_gainers", fake_top_gainers)
+    with TestClient(app.app) as client:
+        response = client.get("/gainers", params={"apiKey": "key", "minutes": 5})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["minutes"] == 5
+    assert body["gainers"] == [
+        {
+            "ticker": "AAA",
+            "name": "AAA Inc",
+            "current_price": 10.5,
+            "avg_price": 10.25,
+            "low_price": 10.0,
+            "volume": 1200,
+            "gain_window": 5.0,
+            "gain_from_low": 5.0,
+            "gain_day": 12.5,
+        }
+    ]
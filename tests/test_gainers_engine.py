@@ -0,0 +1,126 @@
+"""Tests for the gainers engine ranking."""
+import asyncio
+
+import numpy as np
+
+from src.gainers_engine import GainersEngine, _top_indices
+from src.polygon_client import StockBar, to_epoch_ms
+
+
+class FakeClient:
+    """Polygon client stand-in that serves canned snapshots and no bars."""
+
+    def __init__(self, snapshots: list[dict], closes: dict[str, list[float]] = None):
+        self.snapshots = snapshots
+        self.closes = closes or {}
+        self.bar_requests: list[dict] = []
+
+    async def get_gainers(self) -> list[dict]:
+        return self.snapshots
+
+    async def get_all_tickers_snapshot(self) -> list[dict]:
+        return self.snapshots
+
+    async def get_ticker_details_batch(self, tickers: list[str]) -> dict[str, str]:
+        return {t: t for t in tickers}
+
+    async def fetch_recent_bars_batch(self, tickers: list[str], **kwargs) -> dict:
+        """Serve each ticker's closes as the minutes ending at end_time."""
+        self.bar_requests.append(kwargs)
+        end_ms = to_epoch_ms(kwargs["end_time"])
+        bars = {}
+        for ticker in tickers:
+            closes = self.closes.get(ticker, [])
+            bars[ticker] = [
+                StockBar(
+                    ticker=ticker,
+                    open=close,
+                    high=close + 1,
+                    low=close - 1,
+                    close=close,
+                    volume=100,
+                    timestamp=end_ms - (len(closes) - 1 - i) * 60_000,
+                )
+                for i, close in enumerate(closes)
+            ]
+        return bars
+
+
+def snapshot(ticker: str, price: float, prev_close: float) -> dict:
+    return {
+        "ticker": ticker,
+        "lastTrade": {"p": price},
+        "prevDay": {"c": prev_close},
+        "day": {"v": 1000},
+    }
+
+
+def test_top_indices_orders_largest_first():
+    values = np.array([1.0, 5.0, 3.0, 4.0])
+    assert _top_indices(values, 2).tolist() == [1, 3]
+
+
+def test_top_indices_keeps_earliest_ties_at_cutoff():
+    values = np.array(
+        [-1.0, 0.0, 0.0, 0.0, 0.2, 0.4, -0.7, -0.1, 0.0, 1.5,
+         -1.3, 0.0, 1.3, 0.0, 0.3, 0.0, 1.5, 0.0, 0.0, 0.0,
+         0.0, 0.0, -0.0, 0.7, -1.3, 0.0, 0.4, 0.7, -1.2, -0.7]
+    )
+    assert _top_indices(values, 20).tolist() == [
+        9, 16, 12, 23, 27, 5, 26, 14, 4,
+        1, 2, 3, 8, 11, 13, 15, 17, 18, 19, 20,
+    ]
+
+
+def test_top_indices_with_k_beyond_length():
+    values = np.array([0.0, 1.0, 0.0])
+    assert _top_indices(values, 10).tolist() == [1, 0, 2]
+
+
+def test_top_indices_matches_stable_sort_on_tie_heavy_values():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        values = np.where(rng.random(40) < 0.6, 0.0, np.round(rng.normal(size=40), 1))
+        for k in (0, 1, 20, 39, 40):
+            expected = np.argsort(-values, kind="stable")[:k]
+            assert _top_indices(values, k).tolist() == expected.tolist()
+
+
+def test_tied_window_gains_keep_the_best_day_gainers():
+    # With no recent bars every candidate has a 0.0 window gain, so the
+    # ranking must fall back to the day-gain order the candidates came in.
+    snapshots = [snapshot(f"T{i}", 10.0 + i, 10.0) for i in range(30)]
+    engine = GainersEngine(FakeClient(snapshots), top_n=5)
+
+    reports = asyncio.run(engine.get_top_gainers())
+
+    assert [r.ticker for r in reports] == ["T29", "T28", "T27", "T26", "T25"]
+
+
+def test_window_gains_use_lookback_average_and_last_10min_bar():
+    snapshots = [snapshot("AAA", 12.0, 10.0), snapshot("BBB", 30.0, 10.0)]
+    closes = {"AAA": [float(c) for c in range(1, 31)], "BBB": [29.0]}
+    client = FakeClient(snapshots, closes)
+    engine = GainersEngine(client, top_n=2, lookback_minutes=5)
+
+    reports = {r.ticker: r for r in asyncio.run(engine.get_top_gainers())}
+
+    assert len(client.bar_requests) == 1
+    request = client.bar_requests[0]
+    assert request["minutes"] == 30
+
+    # The last 10-minute bucket holds however many minutes have elapsed in
+    # it, so derive the expected low/close from the bar timestamps.
+    end_ms = to_epoch_ms(request["end_time"])
+    bucket_minutes = (end_ms % 600_000) // 60_000 + 1
+    bucket = closes["AAA"][-bucket_minutes:]
+
+    aaa = reports["AAA"]
+    assert aaa.avg_price == 28.0
+    assert aaa.low_price == round(min(bucket) - 1, 4)
+    assert aaa.gain_10min_percent == round((12.0 - bucket[-1]) / bucket[-1] * 100, 2)
+
+    bbb = reports["BBB"]
+    assert bbb.avg_price == 30.0  # fewer than two lookback bars
+    assert bbb.low_price == 28.0
+    assert bbb.gain_10min_percent == round((30.0 - 29.0) / 29.0 * 100, 2)
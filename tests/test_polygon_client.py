@@ -0,0 +1,189 @@
+"""Tests for the Polygon client and its bar helpers."""
+import asyncio
+
+import httpx
+
+from src.polygon_client import PolygonClient, StockBar, bars_between, last_bucket, resample_bars
+
+MINUTE_MS = 60_000
+# 2024-01-02 14:30 UTC, aligned to a 10-minute boundary.
+BASE_MS = 1_704_205_800_000
+
+
+def minute_bar(minute: int, close: float, volume: int = 100, vwap: float = None) -> StockBar:
+    return StockBar(
+        ticker="AAA",
+        open=close - 0.5,
+        high=close + 1,
+        low=close - 1,
+        close=close,
+        volume=volume,
+        timestamp=BASE_MS + minute * MINUTE_MS,
+        vwap=vwap,
+    )
+
+
+class FakePolygonClient(PolygonClient):
+    """PolygonClient whose upstream requests are answered locally."""
+
+    def __init__(self, *args, delay: float = 0.01, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.delay = delay
+        self.endpoints: list[str] = []
+
+    async def _request(self, endpoint: str, params: dict = None) -> dict:
+        self.endpoints.append(endpoint)
+        await asyncio.sleep(self.delay)
+        ticker = endpoint.rsplit("/", 1)[-1]
+        return {"results": {"name": f"{ticker} Inc"}, "tickers": [{"ticker": ticker}]}
+
+
+def test_concurrent_name_lookups_share_one_request():
+    async def run():
+        client = FakePolygonClient("key")
+        first, second = await asyncio.gather(
+            client.get_ticker_details_batch(["AAA", "BBB"]),
+            client.get_ticker_details_batch(["BBB"]),
+        )
+        return client, first, second
+
+    client, first, second = asyncio.run(run())
+
+    assert first == {"AAA": "AAA Inc", "BBB": "BBB Inc"}
+    assert second == {"BBB": "BBB Inc"}
+    assert sorted(client.endpoints) == ["/v3/reference/tickers/AAA", "/v3/reference/tickers/BBB"]
+    assert client._inflight == {}
+
+
+def test_cancelled_name_lookup_does_not_block_later_callers():
+    async def run():
+        client = FakePolygonClient("key")
+        owner = asyncio.create_task(client.get_ticker_details_batch(["AAA"]))
+        # Let the owner register its in-flight future and reach the gather,
+        # then cancel it before the lookup itself gets to run.
+        await asyncio.sleep(0)
+        owner.cancel()
+        await asyncio.gather(owner, return_exceptions=True)
+
+        assert client._inflight == {}
+        return await asyncio.wait_for(client.get_ticker_details_batch(["AAA"]), 1)
+
+    assert asyncio.run(run()) == {"AAA": "AAA Inc"}
+
+
+def test_snapshot_requests_are_cached_and_coalesced():
+    async def run():
+        client = FakePolygonClient("key", cache_ttl=60)
+        results = await asyncio.gather(*(client.get_gainers() for _ in range(5)))
+        return client, results
+
+    client, results = asyncio.run(run())
+
+    assert len(client.endpoints) == 1
+    assert all(r == results[0] for r in results)
+
+
+def test_expired_responses_are_evicted():
+    async def run():
+        client = FakePolygonClient("key", cache_ttl=0)
+        for date in ["2024-01-02", "2024-01-03", "2024-01-04"]:
+            await client.get_grouped_daily_bars(date)
+        return client
+
+    client = asyncio.run(run())
+
+    assert len(client.endpoints) == 3
+    assert len(client._responses) == 1
+    assert len(client._response_locks) == 1
+
+
+def test_resample_bars_aligns_buckets_to_the_clock():
+    bars = [minute_bar(m, 10.0 + m) for m in (3, 4, 9, 10, 12)]
+
+    resampled = resample_bars(bars, 10)
+
+    assert [b.timestamp for b in resampled] == [BASE_MS, BASE_MS + 10 * MINUTE_MS]
+    first, second = resampled
+    assert (first.open, first.high, first.low, first.close) == (12.5, 20.0, 12.0, 19.0)
+    assert first.volume == 300
+    assert (second.open, second.high, second.low, second.close) == (19.5, 23.0, 19.0, 22.0)
+    assert second.volume == 200
+
+
+def test_resample_bars_handles_partial_first_and_last_buckets():
+    bars = [minute_bar(m, 10.0) for m in (8, 9, 10, 11, 20)]
+
+    resampled = resample_bars(bars, 10)
+
+    assert [b.volume for b in resampled] == [200, 200, 100]
+    assert resampled[-1].timestamp == BASE_MS + 20 * MINUTE_MS
+
+
+def test_resample_bars_weights_vwap_by_volume():
+    weighted = resample_bars([minute_bar(0, 10.0, 100, 10.0), minute_bar(1, 11.0, 300, 12.0)], 10)
+    missing = resample_bars([minute_bar(0, 10.0, 100, 10.0), minute_bar(1, 11.0, 300)], 10)
+
+    assert weighted[0].vwap == 11.5
+    assert missing[0].vwap is None
+
+
+def test_resample_bars_and_last_bucket_on_empty_series():
+    assert resample_bars([], 10) == []
+    assert last_bucket([], 10) is None
+
+
+def test_last_bucket_rolls_up_only_the_final_bucket():
+    bars = [minute_bar(m, 10.0 + m) for m in (1, 5, 11, 13, 14)]
+
+    bar = last_bucket(bars, 10)
+
+    assert bar == resample_bars(bars, 10)[-1]
+    assert (bar.low, bar.close, bar.volume) == (20.0, 24.0, 300)
+
+
+def test_bars_between_is_inclusive():
+    bars = [minute_bar(m, 10.0) for m in range(6)]
+
+    window = bars_between(bars, BASE_MS + MINUTE_MS, BASE_MS + 4 * MINUTE_MS)
+
+    assert [b.timestamp for b in window] == [BASE_MS + m * MINUTE_MS for m in range(1, 5)]
+
+
+def test_injected_client_without_base_url_uses_polygon_host():
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.url)
+        return httpx.Response(200, json={"tickers": [{"ticker": "AAA"}]})
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http:
+            return await PolygonClient("key", client=http).get_gainers()
+
+    assert asyncio.run(run()) == [{"ticker": "AAA"}]
+    assert seen[0].host == "api.polygon.io"
+    assert seen[0].path == "/v2/snapshot/locale/us/markets/stocks/gainers"
+    assert seen[0].params["apiKey"] == "key"
+
+
+def test_name_lookups_respect_the_concurrency_cap():
+    class TrackingClient(FakePolygonClient):
+        active = peak = 0
+
+        async def _request(self, endpoint: str, params: dict = None) -> dict:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            try:
+                return await super()._request(endpoint, params)
+            finally:
+                self.active -= 1
+
+    async def run():
+        client = TrackingClient("key", max_concurrency=2)
+        await client.get_ticker_details_batch([f"T{i}" for i in range(6)])
+        return client
+
+    client = asyncio.run(run())
+
+    assert len(client.endpoints) == 6
+    assert client.peak == 2